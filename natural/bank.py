@@ -1,8 +1,34 @@
 from natural.constant import _, IBAN_ALPHABET
 from natural.constant import BBAN_RULES, BBAN_PATTERN, BBAN_MAP
+import collections
+import multiprocessing
+import random
 import re
 
 
+# Error codes reported by :func:`iban_validate_many`
+IBAN_OK = 0
+IBAN_COUNTRY_UNKNOWN = 1
+IBAN_CHECKSUM = 2
+IBAN_STRUCTURE = 3
+
+IBANResult = collections.namedtuple('IBANResult', 'valid error number')
+
+# Number of characters folded into the remainder before reducing it modulo
+# 97, the intermediate value stays well within a machine word
+MOD97_CHUNK = 8
+BBAN_ALPHABET = dict(
+    a=IBAN_ALPHABET[10:],
+    c=IBAN_ALPHABET,
+    n=IBAN_ALPHABET[:10],
+)
+MOD97_TABLE = dict(
+    (key, (10 if digit < 10 else 100, digit))
+    for digit, char in enumerate(IBAN_ALPHABET)
+    for key in (char, ord(char))
+)
+
+
 def bban_compact(number):
     '''
     Printable compacted Basic Bank Account Number. Removes all the padding
@@ -34,6 +60,43 @@ def bban_base10(number):
     return ''.join([str(IBAN_ALPHABET.index(char)) for char in number])
 
 
+def mod97(value, remainder=0):
+    '''
+    Calculates the ISO 7064 mod-97 remainder of ``value`` interpreted in
+    base-10 the same way as :func:`bban_base10` does, without building the
+    intermediate decimal string. The ``value`` may be a string, bytes or a
+    memoryview; pass the result of a previous call as ``remainder`` to
+    continue folding where it left off.
+
+    :param value: string, bytes or memoryview
+    :param remainder: default ``0``
+
+    >>> mod97('068999999501BE43')
+    1
+    >>> mod97(b'BE43', mod97(b'068999999501'))
+    1
+    >>> mod97(memoryview(b'ABCD'))
+    30
+    >>> int(bban_base10('ABCD')) % 97
+    30
+    '''
+
+    if isinstance(value, memoryview):
+        value = value.tobytes()
+
+    table = MOD97_TABLE
+    try:
+        for offset in range(0, len(value), MOD97_CHUNK):
+            for char in value[offset:offset + MOD97_CHUNK]:
+                factor, digit = table[char]
+                remainder = remainder * factor + digit
+            remainder %= 97
+    except KeyError:
+        raise ValueError(_('Invalid IBAN, invalid character'))
+
+    return remainder
+
+
 def _bban_regex(structure):
     return re.compile(
         r'^%s$' % BBAN_PATTERN.sub(
@@ -43,6 +106,80 @@ def _bban_regex(structure):
     )
 
 
+def _bban_length(structure):
+    return sum([
+        int(count) for count, kind in BBAN_PATTERN.findall(structure)
+    ]) + len(BBAN_PATTERN.sub('', structure))
+
+
+def _bban_segments(structure):
+    segments = []
+    offset = 0
+    for count, kind in BBAN_PATTERN.findall(structure):
+        segments.append((offset, offset + int(count)))
+        offset += int(count)
+    return tuple(segments)
+
+
+class BBANValidator(object):
+    '''
+    Registry of compiled Basic Bank Account Number (BBAN) validators. The
+    specification for each country in ``rules`` is compiled once, on first
+    use, and kept for all subsequent lookups.
+
+    :param rules: default :attr:`natural.constant.BBAN_RULES`
+
+    >>> validator = BBANValidator()
+    >>> validator.match('068999999501', 'BE')
+    True
+    >>> validator.match('555', 'NL')
+    False
+    >>> 'XY' in validator
+    False
+    '''
+
+    def __init__(self, rules=BBAN_RULES):
+        self.rules = rules
+        self.compiled = {}
+
+    def __contains__(self, country):
+        return country in self.rules
+
+    def compile(self, country):
+        '''
+        Returns a ``(length, regex, segments)`` tuple for the given
+        ``country``, raises :class:`KeyError` if the country is unknown. The
+        ``segments`` are ``(start, stop)`` offsets of each group in the BBAN
+        specification.
+
+        :param country: string
+        '''
+        try:
+            return self.compiled[country]
+        except KeyError:
+            structure = self.rules[country]['bban']
+            compiled = self.compiled[country] = (
+                _bban_length(structure),
+                _bban_regex(structure),
+                _bban_segments(structure),
+            )
+            return compiled
+
+    def match(self, value, country):
+        '''
+        Check if the compacted ``value`` matches the BBAN specification for
+        ``country``, raises :class:`KeyError` if the country is unknown.
+
+        :param value: string
+        :param country: string
+        '''
+        length, regex, segments = self.compile(country)
+        return len(value) == length and regex.match(value) is not None
+
+
+BBAN_VALIDATOR = BBANValidator()
+
+
 def bban(value, country=None, validate=False):
     '''
     Printable Basic Bank Account Number (BBAN) for the given country code. The
@@ -71,12 +208,11 @@ def bban(value, country=None, validate=False):
         country = country.upper()
 
         try:
-            rules = BBAN_RULES[country]
+            valid = BBAN_VALIDATOR.match(value, country)
         except KeyError:
             raise ValueError(_('Invalid BBAN, country unknown'))
 
-        regex = _bban_regex(rules['bban'])
-        if not regex.match(value):
+        if not valid:
             raise ValueError(
                 _('Invalid BBAN, number does not match specification')
             )
@@ -84,6 +220,51 @@ def bban(value, country=None, validate=False):
     return value
 
 
+def _iban_check(number):
+    '''
+    Runs the IBAN validation pipeline on the compacted ``number`` and returns
+    one of the ``IBAN_*`` error codes, without raising.
+    '''
+    country = number[:2]
+    if country not in BBAN_VALIDATOR:
+        return IBAN_COUNTRY_UNKNOWN
+
+    # Do the 10-mod-97 check
+    try:
+        if mod97(number[:4], mod97(number[4:])) != 1:
+            return IBAN_CHECKSUM
+    except ValueError:
+        return IBAN_CHECKSUM
+
+    # Check BBAN for country
+    if not BBAN_VALIDATOR.match(number[4:], country):
+        return IBAN_STRUCTURE
+
+    return IBAN_OK
+
+
+def _iban_raise(error):
+    if error == IBAN_COUNTRY_UNKNOWN:
+        raise ValueError(_('Invalid IBAN, country unknown'))
+    elif error == IBAN_CHECKSUM:
+        raise ValueError(_('Invalid IBAN, digits check failed'))
+    elif error == IBAN_STRUCTURE:
+        raise ValueError(
+            _('Invalid BBAN, number does not match specification')
+        )
+
+
+def _iban_format(number):
+    groups = [number[x:x + 4] for x in range(0, len(number), 4)]
+    return ' '.join(groups)
+
+
+def _iban_result(number):
+    number = bban_compact(number)
+    error = _iban_check(number)
+    return IBANResult(error == IBAN_OK, error, number)
+
+
 def iban(number, validate=False):
     '''
     Printable International Bank Account Number (IBAN) as specified in ISO
@@ -106,17 +287,345 @@ def iban(number, validate=False):
 
     number = bban_compact(number)
     if validate:
-        country = number[:2]
-        if country not in BBAN_RULES:
-            raise ValueError(_('Invalid IBAN, country unknown'))
+        _iban_raise(_iban_check(number))
 
-        # Do the 10-mod-97 check
-        digits = bban_base10(number)
-        if int(digits) % 97 != 1:
-            raise ValueError(_('Invalid IBAN, digits check failed'))
+    return _iban_format(number)
 
-        # Check BBAN for country
-        bban(number[4:], country, validate=True)
 
-    groups = [number[x:x + 4] for x in range(0, len(number), 4)]
-    return ' '.join(groups)
+def _bban_field(value, rule, field):
+    try:
+        start, stop = rule[field]
+    except KeyError:
+        return ''
+    return value[start:stop]
+
+
+class IBAN(object):
+    '''
+    Parsed International Bank Account Number (IBAN), as returned by
+    :func:`parse_iban`.
+
+    The ``bank``, ``branch`` and ``account`` fields are taken from the
+    offsets in :attr:`natural.constant.BBAN_RULES`, and are empty if the
+    country does not define them. All groups of the BBAN specification are
+    available in ``segments``.
+    '''
+
+    __slots__ = (
+        'country',
+        'check_digits',
+        'bban',
+        'bank',
+        'branch',
+        'account',
+        'segments',
+    )
+
+    def __init__(self, country, check_digits, bban, bank, branch, account,
+                 segments):
+        self.country = country
+        self.check_digits = check_digits
+        self.bban = bban
+        self.bank = bank
+        self.branch = branch
+        self.account = account
+        self.segments = segments
+
+    def __repr__(self):
+        return 'IBAN(%r)' % (self.compact(),)
+
+    def __str__(self):
+        return _iban_format(self.compact())
+
+    def compact(self):
+        '''
+        Compacted representation of the IBAN.
+        '''
+        return ''.join([self.country, self.check_digits, self.bban])
+
+
+def parse_iban(number, validate=True):
+    '''
+    Parse an International Bank Account Number (IBAN) into an :class:`IBAN`
+    record, the number is compacted and validated only once.
+
+    :param number: string
+    :param validate: default ``True``
+
+    >>> parsed = parse_iban('GB29 NWBK 6016 1331 9268 19')
+    >>> print(parsed.country, parsed.check_digits, parsed.bban)
+    GB 29 NWBK60161331926819
+    >>> print(parsed.bank, parsed.branch, parsed.account)
+    NWBK 601613 31926819
+    >>> print(parsed)
+    GB29 NWBK 6016 1331 9268 19
+    >>> parse_iban('NL91ABNA0417164300').segments
+    ('ABNA', '0417164300')
+    >>> parsed = parse_iban('BE68 5390 0754 7034')
+    >>> print(parsed.bank, repr(parsed.branch), parsed.account)
+    539 '' 0075470
+    >>> parsed = parse_iban('ES91 2100 0418 4502 0005 1332')
+    >>> print(parsed.bank, parsed.branch, parsed.account)
+    2100 0418 0200051332
+    >>> parsed = parse_iban('IT60 X054 2811 1010 0000 0123 456')
+    >>> print(parsed.bank, parsed.branch, parsed.account)
+    05428 11101 000000123456
+    >>> parse_iban('BE43068999999502')
+    Traceback (most recent call last):
+        ...
+    ValueError: Invalid IBAN, digits check failed
+    '''
+
+    number = bban_compact(number)
+    if validate:
+        _iban_raise(_iban_check(number))
+
+    country = number[:2]
+    value = number[4:]
+    try:
+        segments = tuple([
+            value[start:stop]
+            for start, stop in BBAN_VALIDATOR.compile(country)[2]
+        ])
+    except KeyError:
+        segments = ()
+
+    rule = BBAN_VALIDATOR.rules.get(country, {})
+    bank, branch, account = [
+        _bban_field(value, rule, field)
+        for field in ('bank', 'branch', 'account')
+    ]
+
+    return IBAN(country, number[2:4], value, bank, branch, account, segments)
+
+
+def iban_validate_many(numbers, processes=None, chunksize=1024):
+    '''
+    Validate International Bank Account Numbers (IBAN) in bulk. Instead of
+    raising :class:`ValueError`, every item yields an :class:`IBANResult`
+    with a ``valid`` flag, one of the ``IBAN_*`` error codes and the
+    compacted ``number``.
+
+    :param numbers: iterable of strings
+    :param processes: default ``None``, number of worker processes to spread
+                      the input over, validates in-process if not set
+    :param chunksize: default ``1024``, number of items sent to a worker
+                      process at a time
+
+    >>> for result in iban_validate_many([
+    ...         'BE43 0689 9999 9501',
+    ...         'XY32012341234123',
+    ...         'BE43068999999502',
+    ...         'NL91ABNA0417164300',
+    ...         'NL251BNA0417164300',
+    ... ]):
+    ...     print(result)
+    IBANResult(valid=True, error=0, number='BE43068999999501')
+    IBANResult(valid=False, error=1, number='XY32012341234123')
+    IBANResult(valid=False, error=2, number='BE43068999999502')
+    IBANResult(valid=True, error=0, number='NL91ABNA0417164300')
+    IBANResult(valid=False, error=3, number='NL251BNA0417164300')
+    '''
+
+    if not processes:
+        return [_iban_result(number) for number in numbers]
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        return pool.map(_iban_result, numbers, chunksize)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _bban_alphabets(structure):
+    alphabets = []
+    for count, kind in BBAN_PATTERN.findall(structure):
+        alphabets.extend([BBAN_ALPHABET.get(kind, '')] * int(count))
+    return alphabets
+
+
+def iban_suggest(number):
+    '''
+    Suggest corrections for an International Bank Account Number (IBAN) that
+    fails validation, by trying every single character substitution and every
+    swap of two adjacent characters. Each candidate is checked against the
+    mod-97 checksum in constant time, using the positional weights of the
+    characters, and against the BBAN specification of its country.
+
+    :param number: string
+    :returns: list of compacted IBAN candidates
+
+    >>> iban_suggest('BE43068999999502')
+    ['BE43048999999502', 'BE43068399999502', 'BE43068999999501']
+    >>> iban_suggest('BE43086999999501')
+    ['BE43086999998501', 'BE43068999999501']
+    >>> iban_suggest('BE43068999999501')
+    []
+    '''
+
+    number = bban_compact(number).upper()
+    size = len(number)
+    if size < 5:
+        return []
+
+    # Work on the rotated number, as the checksum does
+    rotated = number[4:] + number[:4]
+    table = MOD97_TABLE
+    invalid = [i for i, char in enumerate(rotated) if char not in table]
+    if len(invalid) > 1:
+        return []
+
+    widths = []
+    values = []
+    for char in rotated:
+        factor, digit = table.get(char, (10, 0))
+        widths.append(1 if factor == 10 else 2)
+        values.append(digit)
+
+    # Remainder of each prefix, remainder and width of each suffix
+    powers = [1]
+    for x in range(2 * size + 4):
+        powers.append(powers[-1] * 10 % 97)
+    prefix = [0] * (size + 1)
+    for i in range(size):
+        prefix[i + 1] = (prefix[i] * powers[widths[i]] + values[i]) % 97
+    suffix = [0] * (size + 1)
+    exponent = [0] * (size + 1)
+    for i in range(size - 1, -1, -1):
+        exponent[i] = exponent[i + 1] + widths[i]
+        suffix[i] = (values[i] * powers[exponent[i + 1]] + suffix[i + 1]) % 97
+
+    # Valid characters per position of the original number
+    country = number[:2]
+    alphabets = [BBAN_ALPHABET['a']] * 2
+    alphabets.extend([BBAN_ALPHABET['n']] * 2)
+    if country in BBAN_VALIDATOR and \
+            size == BBAN_VALIDATOR.compile(country)[0] + 4:
+        alphabets.extend(
+            _bban_alphabets(BBAN_VALIDATOR.rules[country]['bban'])
+        )
+    alphabets.extend([''] * (size - len(alphabets)))
+
+    candidates = []
+    positions = range(size)
+    if invalid:
+        positions = [(invalid[0] + 4) % size]
+
+    for position in positions:
+        i = (position - 4) % size
+        head = prefix[i]
+        tail = suffix[i + 1]
+        after = exponent[i + 1]
+        for char in alphabets[position]:
+            if char == number[position]:
+                continue
+            factor, digit = table[char]
+            width = 1 if factor == 10 else 2
+            if (head * powers[after + width] +
+                    digit * powers[after] + tail) % 97 == 1:
+                candidates.append(
+                    number[:position] + char + number[position + 1:]
+                )
+
+    if not invalid:
+        for position in range(size - 1):
+            a, b = number[position], number[position + 1]
+            if a == b or b not in alphabets[position] or \
+                    a not in alphabets[position + 1]:
+                continue
+
+            candidate = number[:position] + b + a + number[position + 2:]
+            i = (position - 4) % size
+            if i == size - 1:
+                # The pair is split by the rotation
+                valid = mod97(candidate[:4], mod97(candidate[4:])) == 1
+            else:
+                after = exponent[i + 2]
+                valid = (
+                    prefix[i] * powers[after + widths[i] + widths[i + 1]] +
+                    values[i + 1] * powers[after + widths[i]] +
+                    values[i] * powers[after] +
+                    suffix[i + 2]
+                ) % 97 == 1
+            if valid:
+                candidates.append(candidate)
+
+    return [
+        candidate
+        for candidate in candidates
+        if candidate[:2] in BBAN_VALIDATOR and
+        candidate[2:4].isdigit() and
+        BBAN_VALIDATOR.match(candidate[4:], candidate[:2])
+    ]
+
+
+def _bban_fill_plan(structure):
+    if BBAN_PATTERN.sub('', structure):
+        return None
+
+    plan = []
+    for count, kind in BBAN_PATTERN.findall(structure):
+        if kind not in BBAN_ALPHABET:
+            return None
+        plan.append((int(count), BBAN_ALPHABET[kind]))
+    return plan
+
+
+def iban_generate(countries=None, count=None, seed=None):
+    '''
+    Generate valid International Bank Account Numbers (IBAN), by filling the
+    BBAN specification of the country with random characters and calculating
+    the check digits. The numbers are yielded lazily, in compacted form.
+
+    :param countries: default ``None``, sequence of country codes to pick
+                      from, defaults to all countries with a usable BBAN
+                      specification
+    :param count: default ``None``, number of IBANs to generate, generates
+                  indefinitely if not set
+    :param seed: default ``None``, seed for reproducible output
+
+    >>> numbers = list(iban_generate(['NL', 'GB'], count=100, seed=42))
+    >>> len(numbers)
+    100
+    >>> all(result.valid for result in iban_validate_many(numbers))
+    True
+    >>> numbers == list(iban_generate(['NL', 'GB'], count=100, seed=42))
+    True
+    >>> numbers = list(iban_generate(count=5000, seed=1))
+    >>> sorted(set(BBAN_RULES) - set(number[:2] for number in numbers))
+    ['FI']
+    >>> all(result.valid for result in iban_validate_many(numbers))
+    True
+    >>> next(iban_generate(['FI']))
+    Traceback (most recent call last):
+        ...
+    ValueError: Invalid BBAN, specification not supported
+    '''
+
+    plans = {}
+    for country in countries or sorted(BBAN_RULES):
+        try:
+            plan = _bban_fill_plan(BBAN_RULES[country]['bban'])
+        except KeyError:
+            raise ValueError(_('Invalid BBAN, country unknown'))
+
+        if plan is not None:
+            plans[country] = plan
+        elif countries:
+            raise ValueError(_('Invalid BBAN, specification not supported'))
+
+    countries = sorted(plans)
+    rng = random.Random(seed)
+    choice = rng.choice
+    generated = 0
+    while count is None or generated < count:
+        country = choice(countries)
+        value = ''.join([
+            choice(alphabet)
+            for size, alphabet in plans[country]
+            for x in range(size)
+        ])
+        check = 98 - mod97(country + '00', mod97(value))
+        yield '%s%02d%s' % (country, check, value)
+        generated += 1
@@ -15,7 +15,9 @@ from natural.language import _
 
    Per-country rules for Basic Bank Account Numbers (BBAN) and International
    Bank Account Numbers (IBAN), as specified by the Society for Worldwide
-   Interbank Financial Telecommunication (SWIFT).
+   Interbank Financial Telecommunication (SWIFT). The ``bank``, ``branch``
+   and ``account`` fields are ``(start, stop)`` offsets in the BBAN, national
+   check digits are not part of any of them.
 
 
 .. py:attribute:: BBAN_PATTERN
@@ -38,6 +40,12 @@ from natural.language import _
    Suffixes for the word number representation.
 
 
+.. py:attribute:: SI_PREFIX
+
+   Metric (SI) prefixes for the engineering number representation, from
+   10^-24 to 10^24 in steps of 10^3.
+
+
 .. py:attribute:: FILESIZE_SUFFIX
 
    Suffixes for the file size representations.
@@ -60,134 +68,198 @@ from natural.language import _
 # natural.bank
 BBAN_RULES = dict(
     AD=dict(bban='4!n4!n12!c',
+            bank=(0, 4), branch=(4, 8), account=(8, 20),
             name=_('Andorra')),
     AE=dict(bban='3!n16!n',
+            bank=(0, 3), account=(3, 19),
             name=_('United Arab Emirates')),
     AL=dict(bban='8!n16!c',
+            bank=(0, 3), branch=(3, 7), account=(8, 24),
             name=_('Albania')),
     AT=dict(bban='5!n11!n',
+            bank=(0, 5), account=(5, 16),
             name=_('Austria')),
     AZ=dict(bban='4!a20!c',
+            bank=(0, 4), account=(4, 24),
             name=_('Republic of Azerbaijan')),
     BA=dict(bban='3!n3!n8!n2!n',
+            bank=(0, 3), branch=(3, 6), account=(6, 14),
             name=_('Bosnia and Herzegovina')),
     BE=dict(bban='3!n7!n2!n',
+            bank=(0, 3), account=(3, 10),
             name=_('Belgium')),
     BG=dict(bban='4!a4!n2!n8!c',
+            bank=(0, 4), branch=(4, 8), account=(8, 18),
             name=_('Bulgaria')),
     BH=dict(bban='4!a14!c',
+            bank=(0, 4), account=(4, 18),
             name=_('Bahrain (Kingdom of)')),
     BR=dict(bban='8!n5!n10!n1!a1!c',
+            bank=(0, 8), branch=(8, 13), account=(13, 23),
             name=_('Brazil')),
     CH=dict(bban='5!n12!c',
+            bank=(0, 5), account=(5, 17),
             name=_('Switzerland')),
     CR=dict(bban='3!n14!n',
+            bank=(0, 3), account=(3, 17),
             name=_('Costa Rica')),
     CY=dict(bban='3!n5!n16!c',
+            bank=(0, 3), branch=(3, 8), account=(8, 24),
             name=_('Cyprus')),
     CZ=dict(bban='4!n6!n10!n',
+            bank=(0, 4), account=(4, 20),
             name=_('Czech Republic')),
     DE=dict(bban='8!n10!n',
+            bank=(0, 8), account=(8, 18),
             name=_('Germany')),
     DK=dict(bban='4!n9!n1!n',
+            bank=(0, 4), account=(4, 14),
             name=_('Denmark')),
     FO=dict(bban='4!n9!n1!n',
+            bank=(0, 4), account=(4, 14),
             name=_('Denmark (Faroe Islands')),
     GL=dict(bban='4!n9!n1!n',
+            bank=(0, 4), account=(4, 14),
             name=_('Denmark (Greenland)')),
     DO=dict(bban='4!c20!n',
+            bank=(0, 4), account=(4, 24),
             name=_('Dominican Republic')),
     EE=dict(bban='2!n2!n11!n1!n',
+            bank=(0, 2), account=(2, 16),
             name=_('Estonia')),
     ES=dict(bban='4!n4!n1!n1!n10!n',
+            bank=(0, 4), branch=(4, 8), account=(10, 20),
             name=_('Spain')),
     FI=dict(bban='Not in use',
             name=_('Finland')),
     FR=dict(bban='5!n5!n11!c2!n',
+            bank=(0, 5), branch=(5, 10), account=(10, 21),
             name=_('France')),
     GB=dict(bban='4!a6!n8!n',
+            bank=(0, 4), branch=(4, 10), account=(10, 18),
             name=_('United Kingdom')),
     GE=dict(bban='2!a16!n',
+            bank=(0, 2), account=(2, 18),
             name=_('Georgia')),
     GI=dict(bban='4!a15!c',
+            bank=(0, 4), account=(4, 19),
             name=_('Gibraltar')),
     GR=dict(bban='3!n4!n16!c',
+            bank=(0, 3), branch=(3, 7), account=(7, 23),
             name=_('Greece')),
     GT=dict(bban='4!c20!c',
+            bank=(0, 4), account=(4, 24),
             name=_('Guatemala')),
     HR=dict(bban='7!n10!n',
+            bank=(0, 7), account=(7, 17),
             name=_('Croatia')),
     HU=dict(bban='3!n4!n1!n15!n1!n',
+            bank=(0, 3), branch=(3, 7), account=(8, 23),
             name=_('Hungary')),
     IE=dict(bban='4!a6!n8!n',
+            bank=(0, 4), branch=(4, 10), account=(10, 18),
             name=_('Ireland')),
     IL=dict(bban='3!n3!n13!n',
+            bank=(0, 3), branch=(3, 6), account=(6, 19),
             name=_('Israel')),
     IS=dict(bban='4!n2!n6!n10!n',
+            bank=(0, 2), branch=(2, 4), account=(4, 12),
             name=_('Iceland')),
     IT=dict(bban='1!a5!n5!n12!c',
+            bank=(1, 6), branch=(6, 11), account=(11, 23),
             name=_('Italy')),
     KW=dict(bban='4!a22!c',
+            bank=(0, 4), account=(4, 26),
             name=_('Kuwait')),
     KZ=dict(bban='3!n13!c',
+            bank=(0, 3), account=(3, 16),
             name=_('Kazakhstan')),
     LB=dict(bban='4!n20!c',
+            bank=(0, 4), account=(4, 24),
             name=_('Lebanon')),
     LI=dict(bban='5!n12!c',
+            bank=(0, 5), account=(5, 17),
             name=_('Liechtenstein (Principality of)')),
     LT=dict(bban='5!n11!n',
+            bank=(0, 5), account=(5, 16),
             name=_('Lithuania')),
     LU=dict(bban='3!n13!c',
+            bank=(0, 3), account=(3, 16),
             name=_('Luxembourg')),
     LV=dict(bban='4!a13!c',
+            bank=(0, 4), account=(4, 17),
             name=_('Latvia')),
     MC=dict(bban='5!n5!n11!c2!n',
+            bank=(0, 5), branch=(5, 10), account=(10, 21),
             name=_('Monaco')),
     MD=dict(bban='2!c18!c',
+            bank=(0, 2), account=(2, 20),
             name=_('Republic of Moldova')),
     ME=dict(bban='3!n13!n2!n',
+            bank=(0, 3), account=(3, 16),
             name=_('Montenegro')),
     MK=dict(bban='3!n10!c2!n',
+            bank=(0, 3), account=(3, 13),
             name=_('Macedonia, Former Yugoslav Republic of')),
     MR=dict(bban='5!n5!n11!n2!n',
+            bank=(0, 5), branch=(5, 10), account=(10, 21),
             name=_('Mauritania')),
     MT=dict(bban='4!a5!n18!c',
+            bank=(0, 4), branch=(4, 9), account=(9, 27),
             name=_('Malta')),
     MU=dict(bban='4!a2!n2!n12!n3!n3!a',
+            bank=(0, 6), branch=(6, 8), account=(8, 20),
             name=_('Mauritius')),
     NL=dict(bban='4!a10!n',
+            bank=(0, 4), account=(4, 14),
             name=_('The Netherlands')),
-    NO=dict(bban='4!n6!n1!n ',
+    NO=dict(bban='4!n6!n1!n',
+            bank=(0, 4), account=(4, 11),
             name=_('Norway')),
     PK=dict(bban='4!a16!c',
+            bank=(0, 4), account=(4, 20),
             name=_('Pakistan')),
     PL=dict(bban='8!n16!n',
+            bank=(0, 8), account=(8, 24),
             name=_('Poland')),
     PS=dict(bban='4!a21!c',
+            bank=(0, 4), account=(4, 25),
             name=_('Palestine, State of')),
     PT=dict(bban='4!n4!n11!n2!n',
+            bank=(0, 4), branch=(4, 8), account=(8, 19),
             name=_('Portugal')),
-    QA=dict(bban='2!n4!a21!c',
+    QA=dict(bban='4!a21!c',
+            bank=(0, 4), account=(4, 25),
             name=_('Qatar')),
     RO=dict(bban='4!a16!c',
+            bank=(0, 4), account=(4, 20),
             name=_('Romania')),
     RS=dict(bban='3!n13!n2!n',
+            bank=(0, 3), account=(3, 16),
             name=_('Serbia')),
     SA=dict(bban='2!n18!c',
+            bank=(0, 2), account=(2, 20),
             name=_('Saudi Arabia')),
     SE=dict(bban='3!n16!n1!n',
+            bank=(0, 3), account=(3, 20),
             name=_('Sweden')),
     SI=dict(bban='5!n8!n2!n',
+            bank=(0, 2), branch=(2, 5), account=(5, 13),
             name=_('Slovenia')),
     SK=dict(bban='4!n6!n10!n',
+            bank=(0, 4), account=(4, 20),
             name=_('Slovak Republic')),
     SM=dict(bban='1!a5!n5!n12!c',
+            bank=(1, 6), branch=(6, 11), account=(11, 23),
             name=_('San Marino')),
     TN=dict(bban='2!n3!n13!n2!n',
+            bank=(0, 2), branch=(2, 5), account=(5, 18),
             name=_('Tunisia')),
     TR=dict(bban='5!n1!c16!c',
+            bank=(0, 5), account=(6, 22),
             name=_('Turkey')),
     VG=dict(bban='4!a16!n',
+            bank=(0, 4), account=(4, 20),
             name=_('Virgin Islands, British')),
 )
 BBAN_PATTERN = re.compile(r'([1-9][0-9]*)!([acen])')
@@ -256,6 +328,25 @@ LARGE_NUMBER_SUFFIX = (
     _('novemtrigintillion'),
     _('quadragintillion'),
 )
+SI_PREFIX = (
+    'y',
+    'z',
+    'a',
+    'f',
+    'p',
+    'n',
+    '\u00b5',
+    'm',
+    '',
+    'k',
+    'M',
+    'G',
+    'T',
+    'P',
+    'E',
+    'Z',
+    'Y',
+)
 
 # natural.file
 FILESIZE_SUFFIX = dict(
@@ -1,7 +1,16 @@
+from natural import language
 from natural.language import _, _multi
+import contextlib
 import datetime
 import math
+import re
 import six
+import threading
+import time
+try:
+    from contextvars import ContextVar
+except ImportError:
+    ContextVar = None
 
 
 # Wed, 02 Oct 2002 08:00:00 EST
@@ -31,12 +40,92 @@ ALL_DATETIME_FORMATS = ALL_DATE_FORMATS + (
     ISO8601_DATETIME_FORMAT,
 )
 
+# Recognisers for the common formats, used to pick a format without trial
+ISO8601_PATTERN = re.compile(
+    r'^[0-9]{4}-[0-9]{2}-[0-9]{2}(T[0-9]{2}:[0-9]{2}:[0-9]{2})?$'
+)
+RFC822_DATE_PATTERN = re.compile(
+    r'^[A-Za-z]{3}, [0-9]{1,2} [A-Za-z]{3} ([0-9]{4}|[0-9]{2})$'
+)
+
 # Precalculated timestamps
 TIME_MINUTE = 60
 TIME_HOUR = 3600
 TIME_DAY = 86400
 TIME_WEEK = 604800
 
+# Units used to humanize latencies, in nanoseconds
+LATENCY_UNITS = (
+    (1, 'ns'),
+    (1000, u'\u00b5s'),
+    (1000000, 'ms'),
+    (1000000000, 's'),
+    (60000000000, 'min'),
+    (3600000000000, 'h'),
+)
+
+# Index in LATENCY_UNITS for each bit length, there is at most one unit
+# boundary within the values of each bit length
+LATENCY_BITS = list(
+    max(
+        index
+        for index, (unit, suffix) in enumerate(LATENCY_UNITS)
+        if unit <= max(1, 1 << bits >> 1)
+    )
+    for bits in range(64)
+)
+
+# Units used to decompose a duration, largest first
+DECOMPOSE_UNITS = (
+    (TIME_WEEK, 'week'),
+    (TIME_DAY, 'day'),
+    (TIME_HOUR, 'hour'),
+    (TIME_MINUTE, 'minute'),
+    (1, 'second'),
+)
+
+# Not available before Python 3.7
+_fromisoformat = getattr(datetime.datetime, 'fromisoformat', None)
+
+
+class _LocalVar(threading.local):
+    '''
+    Thread local stand-in for :class:`contextvars.ContextVar` on Python
+    versions without it.
+    '''
+
+    def __init__(self, name, default=None):
+        self.value = default
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        token, self.value = self.value, value
+        return token
+
+    def reset(self, token):
+        self.value = token
+
+
+# Clock of the active reference_time() block
+if ContextVar is None:
+    _REFERENCE = _LocalVar('natural.date.reference')
+else:
+    _REFERENCE = ContextVar('natural.date.reference', default=None)
+
+# Compiled message table for the active locale, see _messages
+_MESSAGES = [(None, None)]
+
+# Boundaries of the last local days looked up by _local_day
+_LOCAL_DAYS = [(0, 0, 0), (0, 0, 0)]
+
+# Last successful format, per call site
+_DAY_HINT = [None]
+_DELTA_HINT = [None]
+_DURATION_HINT = [None]
+_COMPRESS_HINT = [None]
+
 
 def _total_seconds(t):
     '''
@@ -53,10 +142,76 @@ def _total_seconds(t):
     ])
 
 
-def _to_datetime(t):
+def _sniff_format(t, time=True):
+    '''
+    Returns the format for ``t`` if it is recognised as one of the ISO 8601
+    or RFC 822/2822 date formats, or ``None``.
+    '''
+    match = ISO8601_PATTERN.match(t)
+    if match:
+        if match.group(1) is None:
+            return ISO8601_DATE_FORMAT
+        elif time:
+            return ISO8601_DATETIME_FORMAT
+        else:
+            return None
+
+    match = RFC822_DATE_PATTERN.match(t)
+    if match:
+        if len(match.group(1)) == 4:
+            return RFC2822_DATE_FORMAT
+        else:
+            return RFC822_DATE_FORMAT
+
+    return None
+
+
+def _strptime(t, formats, hint=None):
+    '''
+    Parses ``t`` using the first matching format in ``formats``. The ``hint``
+    is a one-item list owned by the call site, holding the format that
+    parsed successfully last time, which is tried first.
+    '''
+    date_format = _sniff_format(t, ISO8601_DATETIME_FORMAT in formats)
+    if date_format is not None:
+        try:
+            if _fromisoformat is not None and \
+                    date_format in (ISO8601_DATE_FORMAT,
+                                    ISO8601_DATETIME_FORMAT):
+                return _fromisoformat(t)
+            else:
+                return datetime.datetime.strptime(t, date_format)
+        except ValueError:
+            pass
+
+    last_format = hint and hint[0]
+    if last_format:
+        try:
+            return datetime.datetime.strptime(t, last_format)
+        except ValueError:
+            pass
+
+    for date_format in formats:
+        if date_format == last_format:
+            continue
+
+        try:
+            d = datetime.datetime.strptime(t, date_format)
+        except ValueError:
+            continue
+
+        if hint is not None:
+            hint[0] = date_format
+        return d
+
+    return None
+
+
+def _to_datetime(t, hint=None):
     '''
     Internal function that tries whatever to convert ``t`` into a
-    :class:`datetime.datetime` object.
+    :class:`datetime.datetime` object. The optional ``hint`` is passed to
+    :func:`_strptime`.
 
 
     >>> _to_datetime('2013-12-11')
@@ -74,14 +229,11 @@ def _to_datetime(t):
         return datetime.datetime.fromtimestamp(t).replace(microsecond=0)
 
     elif isinstance(t, six.string_types):
-        for date_format in ALL_DATETIME_FORMATS:
-            try:
-                d = datetime.datetime.strptime(t, date_format)
-                return d.replace(microsecond=0)
-            except ValueError:
-                pass
+        d = _strptime(t, ALL_DATETIME_FORMATS, hint)
+        if d is None:
+            raise ValueError(_('Format "%s" not supported') % t)
 
-        raise ValueError(_('Format "%s" not supported') % t)
+        return d.replace(microsecond=0)
 
     elif isinstance(t, datetime.datetime):
         return t.replace(microsecond=0)
@@ -94,10 +246,11 @@ def _to_datetime(t):
         raise TypeError
 
 
-def _to_date(t):
+def _to_date(t, hint=None):
     '''
     Internal function that tries whatever to convert ``t`` into a
-    :class:`datetime.date` object.
+    :class:`datetime.date` object. The optional ``hint`` is passed to
+    :func:`_strptime`.
 
     >>> _to_date('2013-12-11')
     datetime.date(2013, 12, 11)
@@ -111,13 +264,11 @@ def _to_date(t):
         return datetime.date.fromtimestamp(t)
 
     elif isinstance(t, six.string_types):
-        for date_format in ALL_DATE_FORMATS:
-            try:
-                return datetime.datetime.strptime(t, date_format).date()
-            except ValueError:
-                pass
+        d = _strptime(t, ALL_DATE_FORMATS, hint)
+        if d is None:
+            raise ValueError('Format not supported')
 
-        raise ValueError('Format not supported')
+        return d.date()
 
     elif isinstance(t, datetime.datetime):
         return t.date()
@@ -129,6 +280,129 @@ def _to_date(t):
         raise TypeError
 
 
+class CoarseClock(object):
+    '''
+    Clock returning the current time as an integer timestamp, which is
+    refreshed at most once per ``interval`` seconds. Use it with
+    :func:`reference_time` to share one "now" between calls.
+
+    :param interval: default ``1``, refresh interval in seconds
+    :param clock: default :func:`time.time`, source of the current time
+
+    >>> ticks = iter([100.0, 100.5, 101.2, 103.0])
+    >>> clock = CoarseClock(interval=2, clock=lambda: next(ticks))
+    >>> [clock(), clock(), clock(), clock()]
+    [100, 100, 100, 103]
+    '''
+
+    def __init__(self, interval=1, clock=time.time):
+        self.interval = interval
+        self.clock = clock
+        self.expires = None
+        self.now = None
+
+    def __call__(self):
+        current = self.clock()
+        if self.expires is None or current >= self.expires:
+            self.now = int(current)
+            self.expires = current + self.interval
+        return self.now
+
+
+@contextlib.contextmanager
+def reference_time(now=None, clock=None):
+    '''
+    Context manager setting the time that :func:`day`, :func:`duration`,
+    :func:`durations`, :func:`duration_until` and :func:`compress` compare to
+    when they are not given a ``now``. Without arguments the current time is
+    frozen for the duration of the block; alternatively pass a fixed ``now``,
+    or a ``clock`` callable returning a timestamp, such as a
+    :class:`CoarseClock`.
+
+    :param now: default ``None``, timestamp, :class:`datetime.date` or
+                :class:`datetime.datetime` object
+    :param clock: default ``None``, callable returning a timestamp
+
+    >>> with reference_time(1410000000):
+    ...     print(duration(1410000000 - 7201))
+    2 hours ago
+    >>> from datetime import datetime
+    >>> with reference_time(datetime(2014, 9, 9, 12)):
+    ...     print(day(datetime(2014, 9, 8, 23)))
+    ...     print(compress(datetime(2014, 9, 9, 9, 59, 59)))
+    yesterday
+    2h1s
+    '''
+
+    if clock is None:
+        if now is None:
+            now = int(time.time())
+
+        def clock():
+            return now
+
+    token = _REFERENCE.set(clock)
+    try:
+        yield clock
+    finally:
+        _REFERENCE.reset(token)
+
+
+def _reference_now():
+    '''
+    Returns the time of the active :func:`reference_time` block, or ``None``.
+    '''
+    clock = _REFERENCE.get()
+    if clock is None:
+        return None
+    else:
+        return clock()
+
+
+def _is_epoch(t):
+    return isinstance(t, six.integer_types) and not isinstance(t, bool)
+
+
+def _local_day(timestamp):
+    '''
+    Returns a ``(start, stop, ordinal)`` tuple with the local midnight
+    boundaries and the ordinal of the local calendar day of the epoch
+    ``timestamp``. The days looked up last are cached, so most lookups are two
+    comparisons.
+    '''
+    for local_day in _LOCAL_DAYS:
+        if local_day[0] <= timestamp < local_day[1]:
+            return local_day
+
+    day = datetime.date.fromtimestamp(timestamp)
+    start = int(time.mktime(day.timetuple()))
+    stop = int(time.mktime((day + datetime.timedelta(days=1)).timetuple()))
+    local_day = (start, stop, day.toordinal())
+    _LOCAL_DAYS[:] = [local_day, _LOCAL_DAYS[0]]
+    return local_day
+
+
+def _day_difference(t1, t2):
+    if isinstance(t1, datetime.datetime):
+        return (t1.date() - t2.date()).days
+    else:
+        return _local_day(t1)[2] - _local_day(t2)[2]
+
+
+def _next_midnight(t):
+    '''
+    Returns the number of seconds from ``t`` until the next local midnight.
+    '''
+    if isinstance(t, datetime.datetime):
+        midnight = datetime.datetime.combine(
+            t.date() + datetime.timedelta(days=1),
+            datetime.time(0, 0),
+        )
+        return _total_seconds(midnight - t)
+    else:
+        return _local_day(t)[1] - t
+
+
 def delta(t1, t2, words=True, justnow=datetime.timedelta(seconds=10)):
     '''
     Calculates the estimated delta between two time objects in human-readable
@@ -145,43 +419,115 @@ def delta(t1, t2, words=True, justnow=datetime.timedelta(seconds=10)):
                considering a delta as meaning 'just now'
     :returns: tuple of (human readable string, delta in seconds)
 
+    If both ``t1`` and ``t2`` are integer timestamps, the delta is calculated
+    in integer seconds, without converting them to :class:`datetime.datetime`
+    objects. Mind that this is the elapsed time, which differs an hour from
+    the local wall clock time when the delta spans a daylight saving time
+    transition.
+
     >>> (x,y) = delta('2012-06-13T15:24:17', '2013-12-11T12:34:56')
     >>> print(x)
     77 weeks
     >>> int(y)
     -594639
+    >>> (x,y) = delta(1339601057, 1386765296)
+    >>> print(x)
+    77 weeks
+    >>> int(y)
+    -594639
     '''
 
-    t1 = _to_datetime(t1)
-    t2 = _to_datetime(t2)
-    diff = t1 - t2
-    date_diff = t1.date() - t2.date()
+    if _is_epoch(t1) and _is_epoch(t2):
+        total = t1 - t2
+
+    else:
+        t1 = _to_datetime(t1, _DELTA_HINT)
+        t2 = _to_datetime(t2, _DELTA_HINT)
+
+        # The datetime module includes milliseconds with float precision.
+        # Floats will give unexpected results here, so we round the value here
+        total = math.ceil(_total_seconds(t1 - t2))
+
+    return _delta(t1, t2, total, words, justnow, _messages())
+
+
+def _compile_messages(_):
+    '''
+    Builds the table of messages used by the functions in this module,
+    translated with ``_``.
+    '''
+    return dict(
+        second=(_('%d second'), _('%d seconds')),
+        minute=(_('%d minute'), _('%d minutes')),
+        hour=(_('%d hour'), _('%d hours')),
+        day=(_('%d day'), _('%d days')),
+        week=(_('%d week'), _('%d weeks')),
+        just_now=_('just now'),
+        a_minute=_('a minute'),
+        an_hour=_('an hour'),
+        today=_('today'),
+        tomorrow=_('tomorrow'),
+        yesterday=_('yesterday'),
+        next_week=_('next week'),
+        last_week=_('last week'),
+        ago=_('%s ago'),
+        from_now=_('%s from now'),
+        compress=(_('%dw'), _('%dd'), _('%dh'), _('%dm'), _('%ds')),
+        decompress={},
+        relative=[],
+        special=frozenset([
+            _('just now'),
+            _('yesterday'),
+            _('tomorrow'),
+            _('last week'),
+            _('next week'),
+        ]),
+    )
+
+
+def _messages():
+    '''
+    Returns the message table for the active locale. The table is compiled
+    once per translation in :mod:`natural.language`, and replaced as a whole
+    when another translation is activated.
+    '''
+    translate = language._
+    cached = _MESSAGES[0]
+    if cached[0] is not translate:
+        cached = _MESSAGES[0] = (translate, _compile_messages(translate))
+    return cached[1]
+
+
+def _plural(messages, unit, count):
+    singular, plural = messages[unit]
+    return _multi(singular, plural, count) % (count,)
+
+
+def _delta(t1, t2, total, words, justnow, messages):
+    '''
+    Implementation of :func:`delta` for the converted ``t1`` and ``t2``, both
+    either :class:`datetime.datetime` objects or integer timestamps, which are
+    ``total`` seconds apart.
+    '''
 
-    # The datetime module includes milliseconds with float precision. Floats
-    # will give unexpected results here, so we round the value here
-    total = math.ceil(_total_seconds(diff))
     total_abs = abs(total)
 
     if total_abs < TIME_DAY:
-        if abs(diff) < justnow and words:
+        if words and total_abs < justnow.total_seconds():
             return (
-                _('just now'),
+                messages['just_now'],
                 0,
             )
 
         elif total_abs < TIME_MINUTE:
             seconds = total_abs
             return (
-                _multi(
-                    _('%d second'),
-                    _('%d seconds'),
-                    seconds
-                ) % (seconds,),
+                _plural(messages, 'second', seconds),
                 0,
             )
         elif total_abs < TIME_MINUTE * 2 and words:
             return (
-                _('a minute'),
+                messages['a_minute'],
                 0,
             )
 
@@ -190,17 +536,13 @@ def delta(t1, t2, words=True, justnow=datetime.timedelta(seconds=10)):
             if total < 0:
                 seconds *= -1
             return (
-                _multi(
-                    _('%d minute'),
-                    _('%d minutes'),
-                    minutes
-                ) % (minutes,),
+                _plural(messages, 'minute', minutes),
                 seconds,
             )
 
         elif total_abs < TIME_HOUR * 2 and words:
             return (
-                _('an hour'),
+                messages['an_hour'],
                 0,
             )
 
@@ -210,38 +552,32 @@ def delta(t1, t2, words=True, justnow=datetime.timedelta(seconds=10)):
                 seconds *= -1
 
             return (
-                _multi(
-                    _('%d hour'),
-                    _('%d hours'),
-                    hours
-                ) % (hours,),
+                _plural(messages, 'hour', hours),
                 seconds,
             )
 
-    elif date_diff.days == 1 and words:
-        return (_('tomorrow'), 0)
-
-    elif date_diff.days == -1 and words:
-        return (_('yesterday'), 0)
+    # Calendar days can only be adjacent within two days, plus a DST shift
+    if words and total_abs < TIME_DAY * 2 + TIME_HOUR:
+        days = _day_difference(t1, t2)
+        if days == 1:
+            return (messages['tomorrow'], 0)
+        elif days == -1:
+            return (messages['yesterday'], 0)
 
-    elif total_abs < TIME_WEEK:
+    if total_abs < TIME_WEEK:
         days, seconds = divmod(total_abs, TIME_DAY)
         if total < 0:
             seconds *= -1
         return (
-            _multi(
-                _('%d day'),
-                _('%d days'),
-                days
-            ) % (days,),
+            _plural(messages, 'day', days),
             seconds,
         )
 
-    elif abs(diff.days) == TIME_WEEK and words:
+    elif abs(total // TIME_DAY) == TIME_WEEK and words:
         if total > 0:
-            return (_('next week'), diff.seconds)
+            return (messages['next_week'], total % TIME_DAY)
         else:
-            return (_('last week'), diff.seconds)
+            return (messages['last_week'], total % TIME_DAY)
 
 # FIXME
 #
@@ -254,11 +590,7 @@ def delta(t1, t2, words=True, justnow=datetime.timedelta(seconds=10)):
         if total < 0:
             seconds *= -1
         return (
-            _multi(
-                _('%d week'),
-                _('%d weeks'),
-                weeks
-            ) % (weeks,),
+            _plural(messages, 'week', weeks),
             seconds,
         )
 
@@ -288,24 +620,26 @@ def day(t, now=None, format='%B %d'):
     >>> print(day(time.time() + 604800))
     next week
     '''
-    t1 = _to_date(t)
-    t2 = _to_date(now or datetime.datetime.now())
+    t1 = _to_date(t, _DAY_HINT)
+    t2 = _to_date(now or _reference_now() or datetime.datetime.now(),
+                  _DAY_HINT)
     diff = t1 - t2
     secs = _total_seconds(diff)
     days = abs(diff.days)
+    messages = _messages()
 
     if days == 0:
-        return _('today')
+        return messages['today']
     elif days == 1:
         if secs < 0:
-            return _('yesterday')
+            return messages['yesterday']
         else:
-            return _('tomorrow')
+            return messages['tomorrow']
     elif days == 7:
         if secs < 0:
-            return _('last week')
+            return messages['last_week']
         else:
-            return _('next week')
+            return messages['next_week']
     else:
         return t1.strftime(format)
 
@@ -357,38 +691,245 @@ def duration(t, now=None, precision=1, pad=', ', words=None,
     tomorrow
     >>> print(duration(datetime(2014, 9, 11, 1), now=datetime(2014, 9, 9, 23)))
     1 day from now
+    >>> print(duration(1410000000 - 7201, now=1410000000))
+    2 hours ago
     '''
 
     if words is None:
         words = precision == 1
 
-    t1 = _to_datetime(t)
-    t2 = _to_datetime(now or datetime.datetime.now())
+    t1, t2 = _duration_times(t, now)
+    return _duration(t1, t2, precision, pad, words, justnow, _messages())
+
 
-    if t1 < t2:
-        format = _('%s ago')
+def _duration_times(t, now):
+    '''
+    Converts ``t`` and ``now`` for :func:`duration`, both are kept as integer
+    timestamps if possible.
+    '''
+    now = now or _reference_now()
+    if _is_epoch(t) and (not now or _is_epoch(now)):
+        return t, now or int(time.time())
     else:
-        format = _('%s from now')
+        return (
+            _to_datetime(t, _DURATION_HINT),
+            _to_datetime(now or datetime.datetime.now(), _DURATION_HINT),
+        )
 
-    result, remains = delta(t1, t2, words=words, justnow=justnow)
-    if result in (
-            _('just now'),
-            _('yesterday'),
-            _('tomorrow'),
-            _('last week'),
-            _('next week'),
-    ):
+
+def _duration(t1, t2, precision, pad, words, justnow, messages):
+    '''
+    Implementation of :func:`duration` for the converted ``t1`` and ``t2``,
+    both either :class:`datetime.datetime` objects or integer timestamps.
+    '''
+
+    if _is_epoch(t1):
+        total = t1 - t2
+    else:
+        total = math.ceil(_total_seconds(t1 - t2))
+
+    result, remains = _delta(t1, t2, total, words, justnow, messages)
+    return _duration_format(result, remains, t1 < t2, precision, pad,
+                            messages)
+
+
+def _duration_format(result, remains, past, precision, pad, messages):
+    '''
+    Formats the :func:`delta` ``result`` and its ``remains`` for
+    :func:`duration`.
+    '''
+
+    if result in messages['special']:
         return result
 
-    elif precision > 1 and remains:
-        t3 = t2 - datetime.timedelta(seconds=remains)
-        return pad.join([
-            result,
-            duration(t2, t3, precision - 1, pad, words=False),
-        ])
+    fragments = [result]
+    if precision > 1 and remains:
+        fragments.extend(_decompose(abs(remains), precision - 1, messages))
+
+    if past:
+        fragments[-1] = messages['ago'] % (fragments[-1],)
+    else:
+        fragments[-1] = messages['from_now'] % (fragments[-1],)
+
+    return pad.join(fragments)
+
+
+def _decompose(seconds, count, messages=None):
+    '''
+    Splits ``seconds`` into weeks, days, hours, minutes and seconds in a single
+    pass, and returns the first ``count`` non-zero fragments. This gives the
+    same fragments as repeatedly calling :func:`delta` on the remainder,
+    without words.
+
+    >>> _decompose(1234567, 3)
+    ['2 weeks', '6 hours', '56 minutes']
+    '''
+    messages = messages or _messages()
+    fragments = []
+    for unit, name in DECOMPOSE_UNITS:
+        if seconds >= unit:
+            value, seconds = divmod(seconds, unit)
+            fragments.append(_plural(messages, name, value))
+            if len(fragments) == count:
+                break
+
+    return fragments
+
+
+def durations(values, now=None, precision=1, pad=', ', words=None,
+              justnow=datetime.timedelta(seconds=10)):
+    '''
+    Time deltas compared to each of the ``values``, see :func:`duration`. The
+    reference time ``now`` and the translated messages are resolved once for
+    all values.
+
+    :param values: iterable of timestamps, :class:`datetime.date` or
+                   :class:`datetime.datetime` objects
+    :param now: default ``None``, optionally a :class:`datetime.datetime`
+                object or timestamp
+    :returns: list of strings
+
+    >>> now = 1410000000
+    >>> for result in durations([now - 1, now - 7201, now + 90], now=now):
+    ...     print(result)
+    just now
+    2 hours ago
+    a minute from now
+    >>> print(durations([now - 1234567], now=now, precision=3)[0])
+    2 weeks, 6 hours, 56 minutes ago
+    '''
+
+    if words is None:
+        words = precision == 1
+
+    now = now or _reference_now()
+    if not now:
+        now_epoch = int(time.time())
+        now_datetime = datetime.datetime.fromtimestamp(now_epoch)
+    elif _is_epoch(now):
+        now_epoch = now
+        now_datetime = datetime.datetime.fromtimestamp(now)
+    else:
+        now_epoch = None
+        now_datetime = _to_datetime(now, _DURATION_HINT)
+
+    messages = _messages()
+    results = []
+    for t in values:
+        if now_epoch is not None and _is_epoch(t):
+            t1, t2 = t, now_epoch
+        else:
+            t1, t2 = _to_datetime(t, _DURATION_HINT), now_datetime
+
+        results.append(
+            _duration(t1, t2, precision, pad, words, justnow, messages)
+        )
+
+    return results
+
+
+def duration_until(t, now=None, precision=1, pad=', ', words=None,
+                   justnow=datetime.timedelta(seconds=10)):
+    '''
+    Time delta compared to ``t``, like :func:`duration`, together with the
+    time until which the rendered string stays the same. Callers can use this
+    to only render relative times again when they have changed.
+
+    :param t: timestamp, :class:`datetime.date` or :class:`datetime.datetime`
+              object
+    :param now: default ``None``, optionally a :class:`datetime.datetime`
+                object or timestamp
+    :returns: tuple of (human readable string, valid until), the latter is a
+              timestamp if ``t`` and ``now`` are integer timestamps, or a
+              :class:`datetime.datetime` object otherwise
+
+    >>> now = 1410000000
+    >>> text, until = duration_until(now - 200, now=now)
+    >>> print(text, until - now)
+    3 minutes ago 40
+    >>> text, until = duration_until(now + 200, now=now)
+    >>> print(text, until - now)
+    3 minutes from now 21
+    >>> text, until = duration_until(now - 7300, now=now, precision=2)
+    >>> print(text, until - now)
+    2 hours, 1 minute ago 20
+    >>> from datetime import datetime
+    >>> print(duration_until(datetime(2014, 9, 9, 10, 30),
+    ...                      now=datetime(2014, 9, 9, 10, 20, 15)))
+    ('9 minutes from now', datetime.datetime(2014, 9, 9, 10, 21, 1))
+    '''
+
+    if words is None:
+        words = precision == 1
 
+    t1, t2 = _duration_times(t, now)
+    if _is_epoch(t1):
+        total = t1 - t2
     else:
-        return format % (result,)
+        total = math.ceil(_total_seconds(t1 - t2))
+
+    messages = _messages()
+    result, remains = _delta(t1, t2, total, words, justnow, messages)
+    text = _duration_format(result, remains, t1 < t2, precision, pad,
+                            messages)
+
+    total_abs = abs(total)
+    if words and total_abs < justnow.total_seconds():
+        # Just now, until we are past the tolerance
+        seconds = int(math.ceil(total + justnow.total_seconds()))
+
+    elif result in (messages['yesterday'], messages['tomorrow']):
+        seconds = _next_midnight(t2)
+        if total > 0:
+            seconds = min(seconds, total_abs - TIME_DAY + 1)
+
+    else:
+        step = _duration_step(total_abs, remains, precision, words)
+        if total < 0:
+            # Moving away from t, until the next step is reached
+            seconds = step - total_abs % step
+        else:
+            # Moving towards t, until we drop below the current step
+            seconds = total_abs % step + 1
+
+        if words and total > 0 and TIME_DAY <= total_abs < TIME_WEEK and \
+                _day_difference(t1, t2) == 2:
+            # After midnight this becomes "tomorrow"
+            seconds = min(seconds, _next_midnight(t2))
+
+    if _is_epoch(t2):
+        return (text, t2 + seconds)
+    else:
+        return (text, t2 + datetime.timedelta(seconds=seconds))
+
+
+def _duration_step(total_abs, remains, precision, words):
+    '''
+    Returns the resolution in seconds of the string :func:`duration` renders
+    for ``total_abs`` seconds.
+    '''
+    for unit, name in DECOMPOSE_UNITS:
+        if total_abs >= unit:
+            break
+
+    if words and unit in (TIME_MINUTE, TIME_HOUR) and total_abs < unit * 2:
+        # "a minute" and "an hour" swallow the remainder
+        return unit
+
+    count = 1
+    remains = abs(remains)
+    for smaller, name in DECOMPOSE_UNITS:
+        if count == precision or not remains:
+            break
+        elif remains >= smaller:
+            remains %= smaller
+            unit = smaller
+            count += 1
+
+    if count == precision:
+        return unit
+    else:
+        return 1
 
 
 def compress(t, sign=False, pad=''):
@@ -423,34 +964,378 @@ def compress(t, sign=False, pad=''):
     3h25m45s
     >>> print(compress(123456))
     1d10h17m36s
+    >>> print(compress(-123))
+    -2m3s
+    >>> print(compress(-59.9))
+    -59s
 
     '''
 
     if isinstance(t, datetime.timedelta):
-        seconds = t.seconds + (t.days * 86400)
+        # Split the magnitude, so both signs truncate towards zero
+        negative = t.days < 0
+        magnitude = abs(t)
+        seconds = magnitude.seconds + (magnitude.days * 86400)
     elif isinstance(t, six.integer_types + (float, )):
         return compress(datetime.timedelta(seconds=t), sign, pad)
     else:
-        return compress(datetime.datetime.now() - _to_datetime(t), sign, pad)
+        now = _reference_now()
+        if now is None:
+            now = datetime.datetime.now()
+        else:
+            now = _to_datetime(now, _COMPRESS_HINT)
+
+        return compress(
+            now - _to_datetime(t, _COMPRESS_HINT),
+            sign,
+            pad,
+        )
+
+    # Negative values always carry their sign, unless they truncate to zero
+    negative = negative and seconds > 0
 
     parts = []
-    if sign:
-        parts.append('-' if t.days < 0 else '+')
+    if sign or negative:
+        parts.append('-' if negative else '+')
 
     weeks, seconds = divmod(seconds, TIME_WEEK)
     days, seconds = divmod(seconds, TIME_DAY)
     hours, seconds = divmod(seconds, TIME_HOUR)
     minutes, seconds = divmod(seconds, TIME_MINUTE)
 
+    formats = _messages()['compress']
     if weeks:
-        parts.append(_('%dw') % (weeks,))
+        parts.append(formats[0] % (weeks,))
     if days:
-        parts.append(_('%dd') % (days,))
+        parts.append(formats[1] % (days,))
     if hours:
-        parts.append(_('%dh') % (hours,))
+        parts.append(formats[2] % (hours,))
     if minutes:
-        parts.append(_('%dm') % (minutes,))
-    if seconds or len(parts) == 0:
-        parts.append(_('%ds') % (seconds,))
+        parts.append(formats[3] % (minutes,))
+    if seconds or not (weeks or days or hours or minutes):
+        parts.append(formats[4] % (seconds,))
 
     return pad.join(parts)
+
+
+def _relative_patterns(messages):
+    '''
+    Returns the compiled patterns for :func:`parse_duration`, built from the
+    :func:`duration` messages of the active locale, as a tuple of (special
+    words, directions, fragment pattern, fragment units).
+    '''
+    if messages['relative']:
+        return messages['relative'][0]
+
+    special = {
+        messages['just_now']: 0,
+        messages['yesterday']: -TIME_DAY,
+        messages['tomorrow']: TIME_DAY,
+        messages['last_week']: -TIME_WEEK,
+        messages['next_week']: TIME_WEEK,
+    }
+
+    directions = []
+    for template, sign in ((messages['ago'], -1), (messages['from_now'], 1)):
+        if '%s' in template:
+            prefix, suffix = template.split('%s', 1)
+            directions.append((
+                re.compile(r'^%s(.+?)%s$' % (
+                    re.escape(prefix),
+                    re.escape(suffix),
+                )),
+                sign,
+            ))
+
+    alternatives = []
+    units = []
+    for unit, name in DECOMPOSE_UNITS:
+        for template in messages[name]:
+            if '%d' in template:
+                prefix, suffix = template.split('%d', 1)
+                alternatives.append(r'%s(\d+)%s' % (
+                    re.escape(prefix),
+                    re.escape(suffix),
+                ))
+                units.append(unit)
+
+    # Words without a count, such as "a minute"
+    for word, unit in ((messages['a_minute'], TIME_MINUTE),
+                       (messages['an_hour'], TIME_HOUR)):
+        alternatives.append(r'(%s)' % (re.escape(word),))
+        units.append(-unit)
+
+    fragment = re.compile(r'^(?:%s)$' % ('|'.join(alternatives),))
+    patterns = (special, tuple(directions), fragment, tuple(units))
+    messages['relative'][:] = [patterns]
+    return patterns
+
+
+def _parse_duration(value, pad, patterns):
+    '''
+    Returns the offset in seconds described by the :func:`duration` output
+    ``value``, or ``None`` if it is not recognised.
+    '''
+    special, directions, fragment, units = patterns
+    if value in special:
+        return special[value]
+
+    fragments = value.split(pad) if pad else [value]
+    for direction, sign in directions:
+        match = direction.match(fragments[-1])
+        if match is not None:
+            break
+    else:
+        return None
+
+    fragments[-1] = match.group(1)
+    total = 0
+    for text in fragments:
+        match = fragment.match(text)
+        if match is None:
+            return None
+
+        unit = units[match.lastindex - 1]
+        if unit < 0:
+            total -= unit
+        else:
+            total += int(match.group(match.lastindex)) * unit
+
+    return sign * total
+
+
+def _parse_reference(now):
+    now = now or _reference_now()
+    if not now:
+        return datetime.datetime.now().replace(microsecond=0)
+    elif _is_epoch(now):
+        return now
+    else:
+        return _to_datetime(now, _DURATION_HINT)
+
+
+def _parse_result(value, offset, now):
+    if offset is None:
+        raise ValueError(_('Format "%s" not supported') % (value,))
+    elif _is_epoch(now):
+        return now + offset
+    else:
+        return now + datetime.timedelta(seconds=offset)
+
+
+def parse_duration(value, now=None, pad=', '):
+    '''
+    Parse a relative time, as returned by :func:`duration`, back into the
+    absolute time compared to ``now``. The phrases are matched against the
+    messages of the active locale, the patterns are compiled once per
+    locale.
+
+    :param value: string
+    :param now: default ``None``, optionally a :class:`datetime.datetime`
+                object or timestamp
+    :param pad: default ``', '``, padding between the fragments
+    :returns: timestamp if ``now`` is a timestamp, :class:`datetime.datetime`
+              object otherwise
+
+    >>> from datetime import datetime
+    >>> now = datetime(2014, 9, 9, 12)
+    >>> parse_duration('3 hours ago', now=now)
+    datetime.datetime(2014, 9, 9, 9, 0)
+    >>> parse_duration('yesterday', now=now)
+    datetime.datetime(2014, 9, 8, 12, 0)
+    >>> parse_duration('2 weeks from now', now=now)
+    datetime.datetime(2014, 9, 23, 12, 0)
+    >>> parse_duration('2 weeks, 6 hours, 56 minutes ago', now=1410000000)
+    1408765440
+    >>> parse_duration('a while ago', now=now)
+    Traceback (most recent call last):
+        ...
+    ValueError: Format "a while ago" not supported
+    '''
+
+    now = _parse_reference(now)
+    offset = _parse_duration(value, pad, _relative_patterns(_messages()))
+    return _parse_result(value, offset, now)
+
+
+def parse_durations(values, now=None, pad=', '):
+    '''
+    Parse multiple relative times, see :func:`parse_duration`. The reference
+    time ``now`` and the patterns are resolved once for all values.
+
+    :param values: iterable of strings
+    :param now: default ``None``, optionally a :class:`datetime.datetime`
+                object or timestamp
+    :param pad: default ``', '``, padding between the fragments
+    :returns: list of timestamps or :class:`datetime.datetime` objects
+
+    >>> parse_durations(['just now', 'an hour ago'], now=1410000000)
+    [1410000000, 1409996400]
+    '''
+
+    now = _parse_reference(now)
+    patterns = _relative_patterns(_messages())
+    return [
+        _parse_result(value, _parse_duration(value, pad, patterns), now)
+        for value in values
+    ]
+
+
+def _decompress_pattern(messages, pad):
+    '''
+    Returns the compiled pattern for :func:`decompress`, built from the
+    :func:`compress` formats of the active locale, and cached per ``pad``.
+    '''
+    try:
+        return messages['decompress'][pad]
+    except KeyError:
+        pass
+
+    if pad:
+        separator = r'(?:%s|\s)*' % (re.escape(pad),)
+    else:
+        separator = r'\s*'
+
+    parts = [r'^\s*([+-])?']
+    for compress_format in messages['compress']:
+        prefix, suffix = compress_format.split('%d', 1)
+        parts.append(r'(?:%s%s(\d+)%s)?' % (
+            separator,
+            re.escape(prefix),
+            re.escape(suffix),
+        ))
+    parts.append(r'\s*$')
+
+    pattern = messages['decompress'][pad] = re.compile(''.join(parts))
+    return pattern
+
+
+def decompress(value, pad='', timedelta=False):
+    '''
+    Parse the compressed format, as returned by :func:`compress`, back into
+    the number of seconds. Signs and padding are accepted, whitespace between
+    the parts is always allowed.
+
+    :param value: string
+    :param pad: default ``''``, padding between the parts
+    :param timedelta: default ``False``, return a :class:`datetime.timedelta`
+                      object instead of the number of seconds
+
+    >>> decompress('1d10h17m36s')
+    123456
+    >>> decompress('-2m 3s')
+    -123
+    >>> decompress('+1w, 1s', pad=', ')
+    604801
+    >>> decompress('3h25m45s', timedelta=True)
+    datetime.timedelta(seconds=12345)
+    >>> decompress(compress(987654321))
+    987654321
+    >>> decompress(compress(-987654321, sign=True, pad=' '), pad=' ')
+    -987654321
+    >>> decompress('3 hours')
+    Traceback (most recent call last):
+        ...
+    ValueError: Format "3 hours" not supported
+    '''
+
+    match = _decompress_pattern(_messages(), pad).match(value)
+    if match is None or match.lastindex is None or match.lastindex < 2:
+        raise ValueError(_('Format "%s" not supported') % (value,))
+
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    total = (
+        int(weeks or 0) * TIME_WEEK +
+        int(days or 0) * TIME_DAY +
+        int(hours or 0) * TIME_HOUR +
+        int(minutes or 0) * TIME_MINUTE +
+        int(seconds or 0)
+    )
+    if sign == '-':
+        total = -total
+
+    if timedelta:
+        return datetime.timedelta(seconds=total)
+    else:
+        return total
+
+
+def _latency(value, digits, scale):
+    if isinstance(value, datetime.timedelta):
+        value = (
+            (value.days * TIME_DAY + value.seconds) * 1000000000 +
+            value.microseconds * 1000
+        )
+    elif not isinstance(value, six.integer_types):
+        value = int(round(value))
+
+    sign = '-' if value < 0 else ''
+    value = abs(value)
+
+    bits = value.bit_length()
+    if bits < len(LATENCY_BITS):
+        index = LATENCY_BITS[bits]
+        if index + 1 < len(LATENCY_UNITS) and \
+                value >= LATENCY_UNITS[index + 1][0]:
+            index += 1
+    else:
+        index = len(LATENCY_UNITS) - 1
+
+    unit, suffix = LATENCY_UNITS[index]
+    if unit == 1:
+        return '%s%d%s' % (sign, value, suffix)
+
+    # Round half up in integer arithmetic, this may carry into the next unit
+    scaled = (value * scale + unit // 2) // unit
+    if index + 1 < len(LATENCY_UNITS) and \
+            scaled >= LATENCY_UNITS[index + 1][0] // unit * scale:
+        unit, suffix = LATENCY_UNITS[index + 1]
+        scaled = (value * scale + unit // 2) // unit
+
+    if digits:
+        whole, fraction = divmod(scaled, scale)
+        return '%s%d.%0*d%s' % (sign, whole, digits, fraction, suffix)
+    else:
+        return '%s%d%s' % (sign, scaled, suffix)
+
+
+def latency(value, digits=1):
+    '''
+    Convert a latency in nanoseconds, such as the difference between two
+    :func:`time.perf_counter_ns` readings, to a human readable format with
+    ``digits`` decimals in the best fitting unit, from nanoseconds up to
+    hours. Integer input is formatted without float conversion.
+
+    :param value: nanoseconds or :class:`datetime.timedelta` object
+    :param digits: default ``1``
+
+    >>> print(latency(512))
+    512ns
+    >>> print(latency(1234567))
+    1.2ms
+    >>> print(latency(2500000000))
+    2.5s
+    >>> print(latency(999960, digits=1))
+    1.0ms
+    >>> print(latency(datetime.timedelta(minutes=90)))
+    1.5h
+    '''
+    return _latency(value, digits, 10 ** digits)
+
+
+def latencies(values, digits=1):
+    '''
+    Convert multiple latencies in nanoseconds, see :func:`latency`.
+
+    :param values: iterable of nanoseconds or :class:`datetime.timedelta`
+                   objects
+    :param digits: default ``1``
+
+    >>> for result in latencies([340000, 1200000, 45000000000], digits=0):
+    ...     print(result)
+    340\u00b5s
+    1ms
+    45s
+    '''
+    scale = 10 ** digits
+    return [_latency(value, digits, scale) for value in values]
@@ -48,3 +48,11 @@ def _multi(singular, plural, count):
         return singular
     else:
         return plural
+
+
+def locale_key(category):
+    '''
+    Returns the current locale setting for ``category``, used to invalidate
+    caches of locale dependent values when the locale changes.
+    '''
+    return locale.setlocale(category)
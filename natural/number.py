@@ -1,45 +1,458 @@
+import decimal
+import fractions
 import locale
+import math
+import numbers
 import re
 import six
-from natural.constant import ORDINAL_SUFFIX, LARGE_NUMBER_SUFFIX
+from natural.constant import ORDINAL_SUFFIX, LARGE_NUMBER_SUFFIX, SI_PREFIX
+from natural.language import locale_key
 
+# Types that are formatted exactly, without conversion to float
+EXACT_TYPES = (numbers.Rational, decimal.Decimal)
 
-def _format(value, digits=None):
-    if isinstance(value, six.string_types):
-        value = locale.atof(value)
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
 
-    number = int(value)
-    convention = locale.localeconv()
+# Powers of 1000 for each of the LARGE_NUMBER_SUFFIX, starting at thousand
+LARGE_NUMBER_POWER = tuple(
+    1000 ** (base + 1) for base in six.moves.xrange(len(LARGE_NUMBER_SUFFIX))
+)
 
-    if digits is None:
-        digits = convention['frac_digits']
+# Index of the empty SI_PREFIX, and the powers of 1000 for each of the
+# SI_PREFIX, exact and as floats
+SI_UNIT = SI_PREFIX.index('')
+SI_POWER = tuple(
+    fractions.Fraction(1000) ** (index - SI_UNIT)
+    for index in six.moves.xrange(len(SI_PREFIX))
+)
+SI_FLOAT_POWER = tuple(float(power) for power in SI_POWER)
 
-    partials = []
-    if digits == 0:
-        number = int(round(value, 0))
-    else:
-        fraction = str(round((value - number) * 10 ** digits)).split('.')[0]
-        fraction = fraction[:digits]
 
-        if len(fraction) < digits:
-            fraction = fraction.ljust(digits, '0')
+class NumberFormatter(object):
+    '''
+    Formats numbers using a decimal point, thousands separator and default
+    number of fraction digits that are captured once, instead of querying the
+    locale for every number. Any of them that is not given is taken from the
+    current locale.
+
+    :param decimal_point: default ``None``
+    :param thousands_sep: default ``None``
+    :param frac_digits: default ``None``
+
+    >>> formatter = NumberFormatter(decimal_point=',', thousands_sep='.')
+    >>> print(formatter.double(1234.56))
+    1.234,56
+    >>> print(formatter.double(1.05))
+    1,05
+    >>> print(formatter.double(1.999))
+    2,00
+    >>> print(formatter.number(1234567))
+    1.234.567
+    >>> print(formatter.percentage(0.5, digits=1))
+    50,0 %
+    >>> print(formatter.word(123456789))
+    123,46 million
+    '''
 
+    def __init__(self, decimal_point=None, thousands_sep=None,
+                 frac_digits=None):
+        if None in (decimal_point, thousands_sep, frac_digits):
+            convention = locale.localeconv()
+            if decimal_point is None:
+                decimal_point = convention['decimal_point']
+            if thousands_sep is None:
+                thousands_sep = convention['thousands_sep']
+            if frac_digits is None:
+                frac_digits = convention['frac_digits']
+
+        self.decimal_point = decimal_point
+        self.thousands_sep = thousands_sep
+        self.frac_digits = frac_digits
+        self.decimal_zero = re.compile(r'%s0+$' % re.escape(decimal_point))
+
+    def atof(self, value):
+        '''
+        Converts a string formatted with this formatter's separators to a
+        float.
+        '''
+        if self.thousands_sep:
+            value = value.replace(self.thousands_sep, '')
+        return float(value.replace(self.decimal_point, '.'))
+
+    def format(self, value, digits=None):
+        '''
+        Formats ``value`` with ``digits`` fraction digits, defaults to the
+        ``frac_digits`` of this formatter.
+        '''
+        if isinstance(value, six.string_types):
+            value = self.atof(value)
+
+        if digits is None:
+            digits = self.frac_digits
+
+        if isinstance(value, EXACT_TYPES):
+            return self._format_exact(value, digits)
+
+        # Floats are scaled and rounded once, then split in integer and
+        # fraction digits like the exact types
+        negative = value < 0
+        scale = 10 ** digits
+        number, fraction = divmod(int(round(abs(value) * scale)), scale)
+        if digits:
+            fraction = str(fraction).rjust(digits, '0')
+        else:
+            fraction = ''
+
+        return self._group(number, fraction, negative)
+
+    def _format_exact(self, value, digits):
+        negative, number, fraction = self._split_exact(value, digits)
+        return self._group(number, fraction, negative)
+
+    def _split_exact(self, value, digits):
+        # Integers, fractions and decimals are scaled and rounded half to
+        # even exactly, then split in integer and fraction digits
+        scale = 10 ** digits
+        if isinstance(value, numbers.Integral):
+            scaled = int(value) * scale
+        else:
+            value = fractions.Fraction(value) * scale
+            scaled, remainder = divmod(value.numerator, value.denominator)
+            remainder *= 2
+            if remainder > value.denominator or \
+                    (remainder == value.denominator and scaled % 2):
+                scaled += 1
+
+        number, fraction = divmod(abs(scaled), scale)
+        if digits:
+            fraction = str(fraction).rjust(digits, '0')
+        else:
+            fraction = ''
+
+        return scaled < 0, number, fraction
+
+    def _group(self, number, fraction, negative=False):
+        # Groups the digits of the positive number, the sign is added in
+        # front unless the value rounded to zero
+        partials = []
         if fraction:
             partials.append(fraction)
-            partials.append(convention['decimal_point'])
+            partials.append(self.decimal_point)
+
+        number = str(number)
+        for x in six.moves.xrange(len(number) + 3, 0, -3):
+            partial = number[max(0, x - 3):x]
+            if partial:
+                partials.append(number[max(0, x - 3):x])
+                partials.append(self.thousands_sep)
+
+        if partials[-1] == self.thousands_sep:
+            partials = partials[:-1]
+
+        if negative and (number != '0' or fraction.strip('0')):
+            partials.append('-')
+
+        partials.reverse()
+        return ''.join(partials)
+
+    def format_many(self, values, digits=None):
+        '''
+        Formats all ``values``, see :meth:`format`. If ``values`` is a NumPy
+        array of numbers, the rounding and splitting of the integer and
+        fraction parts is done on the whole array, leaving only the grouping
+        for each of the values.
+
+        >>> formatter = NumberFormatter(decimal_point='.', thousands_sep=',')
+        >>> values = [-123456, -1.25, 1234.5]
+        >>> if numpy is not None:
+        ...     values = numpy.array(values)
+        >>> formatter.format_many(values, 2)
+        ['-123,456.00', '-1.25', '1,234.50']
+        >>> if numpy is not None:
+        ...     values = numpy.array([-123456, 0, 1234567])
+        >>> formatter.format_many(values, 0)
+        ['-123,456', '0', '1,234,567']
+        >>> if numpy is not None:
+        ...     values = numpy.array([1.05, 1.999, -0.001])
+        >>> formatter.format_many(values, 2)
+        ['1.05', '2.00', '0.00']
+        '''
+        if digits is None:
+            digits = self.frac_digits
+
+        if numpy is None or not isinstance(values, numpy.ndarray) \
+                or values.dtype.kind not in 'iuf' or digits > 15:
+            return [self.format(value, digits) for value in values]
+
+        values = values.ravel()
+        negative = (values < 0).tolist()
+        scale = 10 ** digits
+        if values.dtype.kind == 'f':
+            # Values are scaled and rounded once, like in format, scaled
+            # values that do not fit a 64 bit integer take the slow path
+            scaled = numpy.abs(values) * scale
+            if values.size and not numpy.all(scaled < 2 ** 63):
+                return [self.format(value, digits) for value in values]
+
+            whole, fracs = numpy.divmod(
+                numpy.rint(scaled).astype(numpy.int64),
+                scale,
+            )
+        else:
+            if values.dtype.kind == 'i':
+                values = numpy.abs(values.astype(numpy.int64))
+            whole = values.astype(numpy.uint64)
+            fracs = numpy.zeros(values.size, dtype=numpy.int64)
+
+        if digits:
+            fracs = [
+                str(fraction).rjust(digits, '0')
+                for fraction in fracs.tolist()
+            ]
+        else:
+            fracs = [''] * values.size
+
+        return [
+            self._group(number, fraction, sign)
+            for number, fraction, sign
+            in zip(whole.tolist(), fracs, negative)
+        ]
+
+    def double(self, value, digits=2):
+        '''
+        Converts a number to a formatted double, see :func:`double`.
+        '''
+        return six.u(self.format(value, digits))
+
+    def number(self, value):
+        '''
+        Converts a number to a formatted number, see :func:`number`.
+        '''
+        return six.u(self.format(value, 0))
+
+    def percentage(self, value, digits=2):
+        '''
+        Converts a fraction to a formatted percentage, see
+        :func:`percentage`.
+        '''
+        if isinstance(value, EXACT_TYPES):
+            value = value * 100
+        else:
+            value = float(value) * 100.0
+        return u'' + '%s %%' % (self.format(value, digits),)
+
+    def double_many(self, values, digits=2):
+        '''
+        Converts all ``values`` to formatted doubles, see :func:`double_many`.
+        '''
+        return [six.u(text) for text in self.format_many(values, digits)]
+
+    def number_many(self, values):
+        '''
+        Converts all ``values`` to formatted numbers, see :func:`number_many`.
+        '''
+        return [six.u(text) for text in self.format_many(values, 0)]
+
+    def percentage_many(self, values, digits=2):
+        '''
+        Converts all ``values`` to formatted percentages, see
+        :func:`percentage_many`.
+        '''
+        if numpy is not None and isinstance(values, numpy.ndarray) \
+                and values.dtype.kind in 'iuf':
+            # Integers are scaled exactly, in 64 bits where they fit
+            if values.dtype.kind == 'f':
+                values = values.astype(float) * 100.0
+            elif values.size and (values.min() < -(2 ** 63 // 100) or
+                                  values.max() > 2 ** 63 // 100):
+                values = [value * 100 for value in values.tolist()]
+            else:
+                values = values.astype(numpy.int64) * 100
+        else:
+            values = [
+                value * 100 if isinstance(value, EXACT_TYPES)
+                else float(value) * 100.0
+                for value in values
+            ]
+
+        return [
+            u'' + '%s %%' % (text,)
+            for text in self.format_many(values, digits)
+        ]
+
+    def word(self, value, digits=2):
+        '''
+        Converts a large number to a formatted number containing the textual
+        suffix for that number, see :func:`word`.
+        '''
+        negative = value < 0
+        value = abs(value)
+        if value < 1000:
+            # Values without a suffix are truncated to whole numbers
+            value = int(value)
+
+        # Pick the suffix from the number of digits of the integer part, the
+        # scaling is exact so huge values do not lose precision. If the value
+        # rounds up to the next power of 1000, move up to the next suffix
+        base = (len(str(int(value))) - 1) // 3 - 1
+        value = fractions.Fraction(value)
+        while True:
+            if base >= len(LARGE_NUMBER_SUFFIX):
+                raise OverflowError
+            elif base < 0:
+                scaled = value
+            else:
+                scaled = value / LARGE_NUMBER_POWER[base]
+
+            _, number, fraction = self._split_exact(scaled, digits)
+            if number < 1000:
+                break
+            base += 1
+
+        parts = [
+            self.decimal_zero.sub(
+                '',
+                self._group(number, fraction, negative),
+            ),
+        ]
+        if base >= 0:
+            parts.extend([' ', LARGE_NUMBER_SUFFIX[base]])
+        return u''.join(parts)
+
+    def metric(self, value, digits=1, unit=''):
+        '''
+        Converts a number to a formatted number with a metric (SI) prefix,
+        see :func:`metric`.
+        '''
+        if isinstance(value, decimal.Decimal):
+            negative = value.is_signed()
+        else:
+            negative = value < 0
+        value = abs(value)
+        return self._metric(
+            negative,
+            value,
+            _metric_index(value),
+            digits,
+            unit,
+        )
+
+    def metric_many(self, values, digits=1, unit=''):
+        '''
+        Converts all ``values`` to formatted numbers with a metric (SI)
+        prefix, see :func:`metric_many`.
+        '''
+        if numpy is None or not isinstance(values, numpy.ndarray) \
+                or values.dtype.kind not in 'iuf':
+            return [self.metric(value, digits, unit) for value in values]
+
+        values = values.ravel()
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            exponents = numpy.floor(numpy.log10(numpy.abs(values)))
+            indexes = numpy.where(
+                numpy.isfinite(exponents),
+                exponents // 3 + SI_UNIT,
+                SI_UNIT,
+            ).clip(0, len(SI_PREFIX) - 1).astype(numpy.int64)
+
+        return [
+            self._metric(
+                value < 0,
+                abs(value),
+                index,
+                digits,
+                unit,
+            )
+            for value, index in zip(values.tolist(), indexes.tolist())
+        ]
+
+    def _metric(self, negative, value, index, digits, unit):
+        if isinstance(value, decimal.Decimal) and not value.is_finite() or \
+                not isinstance(value, EXACT_TYPES) and \
+                (math.isinf(value) or math.isnan(value)):
+            value = float(value)
+            sign = negative and math.isinf(value) and '-' or ''
+            return u''.join([sign, str(value), unit])
+
+        # The index picked from the exponent is one too low if the value
+        # rounds up to the next power of 1000, move up to the next prefix
+        while True:
+            if isinstance(value, EXACT_TYPES):
+                _, number, fraction = self._split_exact(
+                    fractions.Fraction(value) / SI_POWER[index],
+                    digits,
+                )
+            else:
+                number, _, fraction = (
+                    '%.*f' % (digits, value / SI_FLOAT_POWER[index])
+                ).partition('.')
+                number = int(number)
+
+            if number < 1000 or index == len(SI_PREFIX) - 1:
+                break
+            index += 1
+
+        return u''.join([
+            self.decimal_zero.sub(
+                '',
+                self._group(number, fraction, negative),
+            ),
+            SI_PREFIX[index],
+            unit,
+        ])
+
+
+def _metric_index(value):
+    '''
+    Returns the index in :data:`SI_PREFIX` for the positive ``value``, based
+    on its decimal exponent.
+    '''
+    if not value:
+        return SI_UNIT
+    elif isinstance(value, numbers.Integral):
+        exponent = len(str(int(value))) - 1
+    elif isinstance(value, decimal.Decimal):
+        if not value.is_finite():
+            return SI_UNIT
+        exponent = value.adjusted()
+    elif math.isinf(value) or math.isnan(value):
+        return SI_UNIT
+    else:
+        exponent = int(math.floor(math.log10(value)))
+
+    return min(max(exponent // 3 + SI_UNIT, 0), len(SI_PREFIX) - 1)
+
+
+# Number of ordinals, starting at 0, that are looked up in a table
+ORDINAL_TABLE_SIZE = 367
+
+# Ordinal table of ORDINAL_TABLE_SIZE entries, see _ordinals
+_ORDINALS = [(0, ())]
+
+# Formatter for the current locale, see _formatter
+_FORMATTER = [(None, None)]
+
+
+def _formatter():
+    '''
+    Returns the :class:`NumberFormatter` for the current locale, which is
+    replaced when the numeric or monetary locale changes.
+    '''
+    key = (locale_key(locale.LC_NUMERIC), locale_key(locale.LC_MONETARY))
+    cached = _FORMATTER[0]
+    if cached[0] != key:
+        cached = _FORMATTER[0] = (key, NumberFormatter())
+    return cached[1]
 
-    number = str(number)
-    for x in six.moves.xrange(len(number) + 3, 0, -3):
-        partial = number[max(0, x - 3):x]
-        if partial:
-            partials.append(number[max(0, x - 3):x])
-            partials.append(convention['thousands_sep'])
 
-    if partials[-1] == convention['thousands_sep']:
-        partials = partials[:-1]
+def _format(value, digits=None):
+    if isinstance(value, six.string_types):
+        value = locale.atof(value)
 
-    partials.reverse()
-    return ''.join(partials)
+    return _formatter().format(value, digits)
 
 
 def ordinal(value):
@@ -67,12 +480,67 @@ def ordinal(value):
     except (TypeError, ValueError):
         raise ValueError
 
+    size, table = _ORDINALS[0]
+    if size != ORDINAL_TABLE_SIZE:
+        size, table = _ordinals()
+    if 0 <= value < size:
+        return table[value]
+    return _ordinal(value)
+
+
+def ordinals(values):
+    '''
+    Converts all numbers in ``values`` to their ordinal representation, see
+    :func:`ordinal`.
+
+    :param values: iterable of numbers
+
+    >>> ordinals([1, 2, 3, 4, 11, 1001])
+    ['1st', '2nd', '3rd', '4th', '11th', '1001st']
+    '''
+
+    size, table = _ordinals()
+    result = []
+    for value in values:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError
+
+        if 0 <= value < size:
+            result.append(table[value])
+        else:
+            result.append(_ordinal(value))
+    return result
+
+
+def _ordinal(value):
     if value % 100 in (11, 12, 13):
         return '%d%s' % (value, ORDINAL_SUFFIX[0])
     else:
         return '%d%s' % (value, ORDINAL_SUFFIX[value % 10])
 
 
+def _ordinals():
+    '''
+    Returns the ``(size, table)`` of the ordinals of the first
+    :data:`ORDINAL_TABLE_SIZE` numbers, which is compiled again when the size
+    is changed. The :data:`natural.constant.ORDINAL_SUFFIX` are translated
+    once, when :mod:`natural.language` binds the translation at import, so the
+    table follows the locale that was active at that time.
+    '''
+    cached = _ORDINALS[0]
+    if cached[0] != ORDINAL_TABLE_SIZE:
+        cached = _ORDINALS[0] = (
+            ORDINAL_TABLE_SIZE,
+            tuple(
+                _ordinal(value)
+                for value in six.moves.xrange(ORDINAL_TABLE_SIZE)
+            ),
+        )
+    return cached
+
+
 def double(value, digits=2):
     '''
     Converts a number to a formatted double based on the current locale.
@@ -88,10 +556,18 @@ def double(value, digits=2):
     12.34
     >>> print(double(1234.56))
     1,234.56
+    >>> import decimal
+    >>> print(double(decimal.Decimal('2.675')))
+    2.68
+    >>> import fractions
+    >>> print(double(fractions.Fraction(-2, 3), digits=3))
+    -0.667
+    >>> print(double(-1.25))
+    -1.25
 
     '''
 
-    return six.u(_format(value, digits))
+    return _formatter().double(value, digits)
 
 
 def number(value):
@@ -111,7 +587,7 @@ def number(value):
 
     '''
 
-    return six.u(_format(value, 0))
+    return _formatter().number(value)
 
 
 def percentage(value, digits=2):
@@ -130,8 +606,55 @@ def percentage(value, digits=2):
 
     '''
 
-    value = float(value) * 100.0
-    return u'' + '%s %%' % (_format(value, digits),)
+    return _formatter().percentage(value, digits)
+
+
+def double_many(values, digits=2):
+    '''
+    Converts all numbers in ``values`` to formatted doubles based on the
+    current locale, see :func:`double`. NumPy arrays are rounded as a whole.
+
+    :param values: iterable or NumPy array of numbers
+    :param digits: default ``2``
+
+    >>> double_many([42, 12.34, 0.5], digits=1)
+    ['42.0', '12.3', '0.5']
+
+    '''
+
+    return _formatter().double_many(values, digits)
+
+
+def number_many(values):
+    '''
+    Converts all numbers in ``values`` to formatted numbers based on the
+    current locale, see :func:`number`. NumPy arrays are rounded as a whole.
+
+    :param values: iterable or NumPy array of numbers
+
+    >>> number_many([42, 12.34, 1.5])
+    ['42', '12', '2']
+
+    '''
+
+    return _formatter().number_many(values)
+
+
+def percentage_many(values, digits=2):
+    '''
+    Converts all fractions in ``values`` to formatted percentages based on the
+    current locale, see :func:`percentage`. NumPy arrays are rounded as a
+    whole.
+
+    :param values: iterable or NumPy array of numbers
+    :param digits: default ``2``
+
+    >>> percentage_many([0.25, 0.5, 1], digits=0)
+    ['25 %', '50 %', '100 %']
+
+    '''
+
+    return _formatter().percentage_many(values, digits)
 
 
 def word(value, digits=2):
@@ -143,32 +666,68 @@ def word(value, digits=2):
 
     >>> print(word(1))
     1
+    >>> print(word(12.7))
+    12
     >>> print(word(123456789))
     123.46 million
+    >>> import decimal
+    >>> print(word(decimal.Decimal('98765432109876543210')))
+    98.77 quintillion
+    >>> print(word(999999999))
+    1 billion
+    >>> print(word(decimal.Decimal('1245.1')))
+    1.25 thousand
 
     '''
 
-    convention = locale.localeconv()
-    decimal_point = convention['decimal_point']
-    decimal_zero = re.compile(r'%s0+' % re.escape(decimal_point))
-    prefix = value < 0 and '-' or ''
-    value = abs(int(value))
-    if value < 1000:
-        return u''.join([
-            prefix,
-            decimal_zero.sub('', _format(value, digits)),
-        ])
+    return _formatter().word(value, digits)
+
+
+def metric(value, digits=1, unit=''):
+    '''
+    Converts a number to a formatted number with a metric (SI) prefix, from
+    ``y`` (10^-24) to ``Y`` (10^24), based on the current locale.
+
+    :param value: number
+    :param digits: default ``1``
+    :param unit: default ``''``, appended to the prefix
+
+    >>> print(metric(12345))
+    12.3k
+    >>> print(metric(4.5e6))
+    4.5M
+    >>> print(metric(0.87))
+    870m
+    >>> print(metric(0.0000032, unit='s'))
+    3.2\u00b5s
+    >>> print(metric(999960))
+    1M
+    >>> print(metric(-42))
+    -42
+    >>> print(metric(-1e-30))
+    0y
+    >>> import decimal
+    >>> print(metric(decimal.Decimal('-Infinity')))
+    -inf
+
+    '''
+
+    return _formatter().metric(value, digits, unit)
+
+
+def metric_many(values, digits=1, unit=''):
+    '''
+    Converts all numbers in ``values`` to formatted numbers with a metric (SI)
+    prefix, see :func:`metric`. The prefixes for NumPy arrays are picked for
+    the whole array at once.
+
+    :param values: iterable or NumPy array of numbers
+    :param digits: default ``1``
+    :param unit: default ``''``, appended to the prefix
+
+    >>> metric_many([1500, 0.25, 3], unit='B')
+    ['1.5kB', '250mB', '3B']
+
+    '''
 
-    for base, suffix in enumerate(LARGE_NUMBER_SUFFIX):
-        exp = (base + 2) * 3
-        power = 10 ** exp
-        if value < power:
-            value = value / float(10 ** (exp - 3))
-            return ''.join([
-                prefix,
-                decimal_zero.sub('', _format(value, digits)),
-                ' ',
-                suffix,
-            ])
-
-    raise OverflowError
+    return _formatter().metric_many(values, digits, unit)
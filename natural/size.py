@@ -1,6 +1,15 @@
+import array
+import fractions
 import locale
+import re
 from natural.constant import FILESIZE_SUFFIX
-from natural.number import _format
+from natural.language import _
+from natural.number import _format, _formatter
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
 
 FILESIZE_BASE = dict(
     decimal=1000,
@@ -8,6 +17,33 @@ FILESIZE_BASE = dict(
     gnu=1024,
 )
 
+# Separator between the number and the suffix, for each format
+FILESIZE_SEPARATOR = dict(
+    decimal=u' ',
+    binary=u' ',
+    gnu=u'',
+)
+
+# Suffixes including their separator and the size of the next unit as float,
+# used to scale the value, for each format
+_FILESIZE_UNITS = dict(
+    (name, tuple(
+        (FILESIZE_SEPARATOR[name] + suffix, float(base ** (index + 1)))
+        for index, suffix in enumerate(FILESIZE_SUFFIX[name])
+    ))
+    for name, base in FILESIZE_BASE.items()
+)
+
+# Number of bytes for each of the suffixes of all formats
+FILESIZE_MULTIPLIER = dict(
+    (suffix, FILESIZE_BASE[name] ** index)
+    for name in FILESIZE_SUFFIX
+    for index, suffix in enumerate(FILESIZE_SUFFIX[name])
+)
+
+# Size pattern for the current number formatter, see _size_pattern
+_SIZE_PATTERN = [(None, None)]
+
 
 def filesize(value, format='binary', digits=2):
     '''
@@ -35,20 +71,92 @@ def filesize(value, format='binary', digits=2):
     sign = size < 0 and u'-' or ''
     size = abs(size)
 
-    for i, suffix in enumerate(FILESIZE_SUFFIX[format]):
-        unit = base ** (i + 1)
-        if size < unit:
-            result = u''.join([
-                sign,
-                _format(base * size / float(unit), digits),
-                u' ',
-                suffix,
-            ])
-            if format == 'gnu':
-                result = result.replace(' ', '')
-            return result
+    # Pick the unit from the number of bits or digits
+    if base == 1024:
+        index = max(size.bit_length() - 1, 0) // 10
+    else:
+        index = (len(str(size)) - 1) // 3
+
+    units = _FILESIZE_UNITS[format]
+    if index >= len(units):
+        raise OverflowError
+
+    suffix, unit = units[index]
+    return u''.join([
+        sign,
+        _format(base * size / unit, digits),
+        suffix,
+    ])
+
+
+def filesize_many(values, format='binary', digits=2):
+    '''
+    Convert all file sizes in ``values`` into natural readable format, see
+    :py:func:`filesize`. For NumPy arrays and :py:class:`array.array` objects
+    the units and scaled sizes are computed for the whole array at once.
+
+    :param values: iterable, NumPy array or :py:class:`array.array` of sizes
+    :param format: default ``binary``, choices ``binary``, ``decimal`` or
+                   ``gnu``
+    :param digits: default ``2``
+
+    >>> filesize_many([123, 123456, 1234567890])
+    ['123.00 B', '120.56 KiB', '1.15 GiB']
+    >>> filesize_many(array.array('q', [-2048, 4096]), format='gnu', digits=1)
+    ['-2.0K', '4.0K']
+    '''
+
+    if format not in FILESIZE_SUFFIX:
+        raise TypeError
+
+    if numpy is not None and isinstance(values, array.array):
+        values = numpy.asarray(values)
+
+    if numpy is None or not isinstance(values, numpy.ndarray) \
+            or values.dtype.kind not in 'iuf':
+        return [filesize(value, format, digits) for value in values]
+
+    values = values.ravel()
+    if values.dtype.kind == 'f':
+        # Sizes that do not fit a 64 bit integer take the slow path
+        if not numpy.all(numpy.abs(values) < 2 ** 63):
+            return [filesize(value, format, digits) for value in values]
+        values = values.astype(numpy.int64)
+
+    negative = (values < 0).tolist()
+    if values.dtype.kind == 'u':
+        sizes = values.astype(numpy.uint64)
+    else:
+        sizes = numpy.abs(values.astype(numpy.int64)).astype(numpy.uint64)
+
+    # The unit is the number of unit sizes that are not larger than the size
+    base = FILESIZE_BASE[format]
+    units = _FILESIZE_UNITS[format]
+    limits = [
+        base ** (index + 1)
+        for index in range(len(units))
+        if base ** (index + 1) < 2 ** 64
+    ]
+    indexes = numpy.searchsorted(
+        numpy.array(limits, dtype=numpy.uint64),
+        sizes,
+        side='right',
+    )
+
+    # Multiply by the base before converting to float where that is exact,
+    # so the result matches filesize
+    exact = sizes <= (2 ** 64 - 1) // base
+    scaled = numpy.where(
+        exact,
+        (sizes * numpy.uint64(base)).astype(float),
+        sizes.astype(float) * base,
+    ) / numpy.array([unit for _, unit in units])[indexes]
 
-    raise OverflowError
+    texts = _formatter().format_many(scaled, digits)
+    return [
+        u''.join([sign and u'-' or '', text, units[index][0]])
+        for sign, text, index in zip(negative, texts, indexes.tolist())
+    ]
 
 
 def decimalsize(value):
@@ -91,3 +199,102 @@ def gnusize(value, digits=1):
     1.1G
     '''
     return filesize(value, format='gnu', digits=digits)
+
+
+def _size_pattern():
+    '''
+    Returns the compiled pattern for :py:func:`parse_size`, using the decimal
+    point and thousands separator of the current locale. The pattern is
+    compiled again when the locale changes.
+    '''
+    formatter = _formatter()
+    cached = _SIZE_PATTERN[0]
+    if cached[0] is formatter:
+        return cached[1]
+
+    digits = r'\d+'
+    if formatter.thousands_sep:
+        digits = r'(?:\d{1,3}(?:%s\d{3})+|\d+)' % (
+            re.escape(formatter.thousands_sep),
+        )
+    suffixes = sorted(FILESIZE_MULTIPLIER, key=len, reverse=True)
+    pattern = re.compile(
+        r'''
+        ^\s*
+        (?P<sign>[+-]?)
+        (?P<number>%(digits)s(?:%(point)s\d*)?|%(point)s\d+)
+        \s*
+        (?P<suffix>%(suffixes)s)?
+        \s*$
+        ''' % dict(
+            digits=digits,
+            point=re.escape(formatter.decimal_point),
+            suffixes='|'.join(map(re.escape, suffixes)),
+        ),
+        re.VERBOSE,
+    )
+    _SIZE_PATTERN[0] = (formatter, pattern)
+    return pattern
+
+
+def _parse_size(value, pattern, formatter):
+    match = pattern.match(value)
+    if match is None:
+        raise ValueError(_('Format "%s" not supported') % (value,))
+
+    number = match.group('number')
+    if formatter.thousands_sep:
+        number = number.replace(formatter.thousands_sep, '')
+    number = number.replace(formatter.decimal_point, '.')
+
+    # Scale exactly and round half up to whole bytes
+    size = fractions.Fraction(number)
+    size *= FILESIZE_MULTIPLIER[match.group('suffix') or 'B']
+    result, remainder = divmod(size.numerator, size.denominator)
+    if remainder * 2 >= size.denominator:
+        result += 1
+
+    if match.group('sign') == '-':
+        return -result
+    return result
+
+
+def parse_size(value):
+    '''
+    Parse a file size in natural readable format, as returned by
+    :py:func:`filesize`, into a number of bytes. All ``binary``, ``decimal``
+    and ``gnu`` suffixes are recognised, a value without suffix is in bytes.
+
+    :param value: string
+    :returns: number of bytes, rounded to the nearest integer
+
+    >>> parse_size('1.5 GiB')
+    1610612736
+    >>> parse_size('120.6K')
+    123494
+    >>> parse_size('3 MB')
+    3000000
+    >>> parse_size('-2.0K')
+    -2048
+    >>> parse_size('42')
+    42
+    '''
+
+    return _parse_size(value, _size_pattern(), _formatter())
+
+
+def parse_sizes(values):
+    '''
+    Parse multiple file sizes, see :py:func:`parse_size`. The pattern is
+    resolved once for all values.
+
+    :param values: iterable of strings
+    :returns: list of numbers of bytes
+
+    >>> parse_sizes(['123.00 B', '120.56 KiB', '1.1G'])
+    [123, 123453, 1181116006]
+    '''
+
+    pattern = _size_pattern()
+    formatter = _formatter()
+    return [_parse_size(value, pattern, formatter) for value in values]